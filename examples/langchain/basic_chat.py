@@ -13,10 +13,14 @@ Usage:
     python basic_chat.py
 """
 
+import asyncio
+import os
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 
 
-def main():
+async def main():
     # Configure LangChain to use Genie as the backend
     # Note: api_key can be any string since Genie doesn't require authentication
     llm = ChatOpenAI(
@@ -31,48 +35,86 @@ def main():
     print("=" * 60)
     print()
 
+    messages = [
+        SystemMessage(content="You are a helpful coding assistant. Be concise."),
+        HumanMessage(content="What is a closure in programming?"),
+    ]
+
+    # Examples 1 and 2 are independent, so fire them concurrently.
+    # Wall time is ~max(RTT) instead of the sum of both round-trips.
+    response1, response2 = await asyncio.gather(
+        llm.ainvoke("Say hello from Genie!"),
+        llm.ainvoke(messages),
+    )
+
     # Example 1: Simple message
     print("Example 1: Simple greeting")
     print("-" * 40)
-    response = llm.invoke("Say hello from Genie!")
-    print(f"Response: {response.content}")
+    print(f"Response: {response1.content}")
     print()
 
     # Example 2: With system message
     print("Example 2: With system prompt")
     print("-" * 40)
-    from langchain_core.messages import SystemMessage, HumanMessage
-
-    messages = [
-        SystemMessage(content="You are a helpful coding assistant. Be concise."),
-        HumanMessage(content="What is a closure in programming?"),
-    ]
-    response = llm.invoke(messages)
-    print(f"Response: {response.content}")
+    print(f"Response: {response2.content}")
     print()
 
     # Example 3: Multi-turn conversation
+    # The second turn depends on the first, so these stay sequential.
+    # A stable prompt_cache_key lets the server reuse the KV cache for
+    # the shared prefix (system prompt + first turn) across turns.
     print("Example 3: Multi-turn conversation")
     print("-" * 40)
-    from langchain_core.messages import AIMessage
+
+    tutor = llm.bind(extra_body={"prompt_cache_key": "basic-chat-tutor"})
 
     conversation = [
         SystemMessage(content="You are a math tutor. Explain concepts step by step."),
         HumanMessage(content="What is 15% of 80?"),
     ]
 
+    # Stream each turn so output starts at first-token latency instead
+    # of waiting for the full completion.
     # First turn
-    response1 = llm.invoke(conversation)
     print(f"User: What is 15% of 80?")
-    print(f"Assistant: {response1.content}")
-
-    # Second turn
-    conversation.append(AIMessage(content=response1.content))
-    conversation.append(HumanMessage(content="Now calculate 20% of 150"))
+    print("Assistant: ", end="", flush=True)
+    turn1 = None
+    async for chunk in tutor.astream(conversation):
+        print(chunk.content, end="", flush=True)
+        turn1 = chunk if turn1 is None else turn1 + chunk
+    print()
 
-    response2 = llm.invoke(conversation)
+    # Second turn. The full history is resent by default: Genie's chat
+    # endpoint keeps no server-side conversation state, silently ignores
+    # unknown request fields, and a response id alone doesn't prove the
+    # backend supports the Responses API. Set
+    # GENIE_USE_PREVIOUS_RESPONSE_ID=1 against a backend known to
+    # support previous_response_id to send only the new message and
+    # reuse the server-cached prefix.
     print(f"\nUser: Now calculate 20% of 150")
-    print(f"Assistant: {response2.content}")
+    print("Assistant: ", end="", flush=True)
+    followup = HumanMessage(content="Now calculate 20% of 150")
+    # langchain-openai puts the provider response id on the merged
+    # chunk's .id; check response_metadata first for backends that
+    # surface it there instead.
+    prev_id = (turn1.response_metadata.get("id") or turn1.id) if turn1 is not None else None
+    use_prev_id = os.environ.get("GENIE_USE_PREVIOUS_RESPONSE_ID") == "1"
+    if prev_id and use_prev_id:
+        turn2_llm = llm.bind(
+            extra_body={
+                "prompt_cache_key": "basic-chat-tutor",
+                "previous_response_id": prev_id,
+            }
+        )
+        turn2_input = [followup]
+    else:
+        conversation.append(AIMessage(content=turn1.content if turn1 is not None else ""))
+        conversation.append(followup)
+        turn2_llm = tutor
+        turn2_input = conversation
+    async for chunk in turn2_llm.astream(turn2_input):
+        print(chunk.content, end="", flush=True)
+    print()
 
     print()
     print("=" * 60)
@@ -81,5 +123,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
-
+    asyncio.run(main())